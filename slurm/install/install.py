@@ -4,14 +4,37 @@ import logging
 import logging.config
 import os
 import re
+import shutil
+import signal
 import subprocess
 import sys
+import urllib.request
 import installlib as ilib
-from typing import Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+try:
+    # optional - much faster for large cluster configs, but not always installed.
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
 # Legacy: used for connecting to Azure MariaDB, which is deprecated.
 LOCAL_AZURE_CA_PEM = "AzureCA.pem"
 
+# Cached output of `jetpack config --json`, invalidated when jetpack's node config changes.
+JETPACK_CONFIG_CACHE = "/run/azslurm/jetpack_config.json"
+JETPACK_NODE_CONFIG = "/opt/cycle/jetpack/config/node.json"
+
+# anything that is not a letter, digit or '-'
+_SANITIZE_RE = re.compile(r"[^a-zA-Z0-9-]")
+# a Feature= token inside of slurm.dynamic_config, case insensitive.
+_FEATURE_RE = re.compile(r"(?<!\S)Feature=", re.IGNORECASE)
+# slurmd's -b flag as a standalone option
+_SLURMD_B_FLAG_RE = re.compile(r"(?:^|\s)-b(?:\s|$)")
+
 
 class InstallSettings:
     def __init__(self, config: Dict, platform_family: str, mode: str) -> None:
@@ -70,9 +93,7 @@ class InstallSettings:
         )
         self.node_name_prefix = config["slurm"].get("node_prefix")
         if self.node_name_prefix:
-            self.node_name_prefix = re.sub(
-                "[^a-zA-Z0-9-]", "-", self.node_name_prefix
-            ).lower()
+            self.node_name_prefix = _escape(self.node_name_prefix)
 
         self.ensure_waagent_monitor_hostname = config["slurm"].get(
             "ensure_waagent_monitor_hostname", True
@@ -87,6 +108,8 @@ class InstallSettings:
         self.dynamic_config
 
         self.max_node_count = int(config["slurm"].get("max_node_count", 10000))
+        # seconds to wait for rhel.sh/ubuntu.sh/suse.sh to install packages
+        self.installer_timeout = int(config["slurm"].get("installer_timeout", 3600))
 
         self.additonal_slurm_config = (
             config["slurm"].get("additional", {}).get("config")
@@ -95,23 +118,25 @@ class InstallSettings:
         self.secondary_scheduler_name = config["slurm"].get("secondary_scheduler_name")
         self.is_primary_scheduler = config["slurm"].get("is_primary_scheduler", self.mode == "scheduler")
         self.config_dir = f"/sched/{self.slurm_cluster_name}"
+        # shared files under config_dir
+        self.munge_key_path = f"{self.config_dir}/munge.key"
+        self.accounting_conf_path = f"{self.config_dir}/accounting.conf"
+        self.azure_ca_pem_path = f"{self.config_dir}/AzureCA.pem"
+        self.slurmdbd_conf_path = f"{self.config_dir}/slurmdbd.conf"
+        self.slurm_conf_path = f"{self.config_dir}/slurm.conf"
+        self.cgroup_conf_path = f"{self.config_dir}/cgroup.conf"
+        self.azure_conf_path = f"{self.config_dir}/azure.conf"
+        self.keep_alive_conf_path = f"{self.config_dir}/keep_alive.conf"
+        self.gres_conf_path = f"{self.config_dir}/gres.conf"
         # Leave the ability to disable this.
         self.ubuntu22_waagent_fix = config["slurm"].get("ubuntu22_waagent_fix", True)
 
 
 def _inject_vm_size(dynamic_config: str, vm_size: str) -> str:
-    lc = dynamic_config.lower()
-    if "feature=" not in lc:
+    if not _FEATURE_RE.search(dynamic_config):
         logging.warning("Dynamic config is specified but no 'Feature={some_flag}' is set under slurm.dynamic_config.")
         return dynamic_config
-    else:
-        ret = []
-        for tok in dynamic_config.split():
-            if tok.lower().startswith("feature="):
-                ret.append(f"Feature={vm_size},{tok[len('Feature='):]}")
-            else:
-                ret.append(tok)
-        return " ".join(ret)
+    return _FEATURE_RE.sub(lambda _: f"Feature={vm_size},", dynamic_config)
 
 def setup_config_dir(s: InstallSettings) -> None:
 
@@ -120,7 +145,7 @@ def setup_config_dir(s: InstallSettings) -> None:
         ilib.directory(s.config_dir, owner="root", group="root", mode=755)
 
 def _escape(s: str) -> str:
-    return re.sub("[^a-zA-Z0-9-]", "-", s).lower()
+    return _SANITIZE_RE.sub("-", s).lower()
 
 
 def setup_users(s: InstallSettings) -> None:
@@ -147,57 +172,64 @@ def setup_users(s: InstallSettings) -> None:
 
 
 def run_installer(s: InstallSettings, path: str, mode: str) -> None:
-    subprocess.check_call([path, mode, s.slurmver, str(s.disable_pmc)])
+    cmd = [path, mode, s.slurmver, str(s.disable_pmc)]
+    # run in its own session so that we can kill package scriptlets etc. as well.
+    proc = subprocess.Popen(cmd, start_new_session=True)
+    try:
+        proc.wait(timeout=s.installer_timeout)
+    except subprocess.TimeoutExpired:
+        logging.error(f"{path} did not complete within {s.installer_timeout} seconds. Killing it.")
+        _killpg(proc)
+        raise
+    except BaseException:
+        _killpg(proc)
+        raise
+
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd)
+
+
+def _killpg(proc: subprocess.Popen) -> None:
+    for sig in [signal.SIGTERM, signal.SIGKILL]:
+        try:
+            os.killpg(proc.pid, sig)
+        except ProcessLookupError:
+            return
+        try:
+            proc.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            pass
 
 
 def fix_permissions(s: InstallSettings) -> None:
-    # Fix munge permissions and create key
-    ilib.directory(
-        "/var/lib/munge",
-        owner=s.munge_user,
-        group=s.munge_grp,
-        mode=711,
-        recursive=True,
-    )
-
-    ilib.directory(
-        "/var/log/munge", owner="root", group="root", mode=700, recursive=True
-    )
-
-    ilib.directory(
-        "/run/munge", owner=s.munge_user, group=s.munge_grp, mode=755, recursive=True
+    # Fix munge permissions and set up slurm directories
+    ilib.directories_bulk(
+        [
+            ("/var/lib/munge", s.munge_user, s.munge_grp, 711, True),
+            ("/var/log/munge", "root", "root", 700, True),
+            ("/run/munge", s.munge_user, s.munge_grp, 755, True),
+            (f"{s.config_dir}/munge", s.munge_user, s.munge_grp, 700, False),
+            ("/var/spool/slurmd", s.slurm_user, s.slurm_grp, None, False),
+            ("/var/log/slurmd", s.slurm_user, s.slurm_grp, None, False),
+            ("/var/log/slurmctld", s.slurm_user, s.slurm_grp, None, False),
+        ]
     )
 
-    ilib.directory(f"{s.config_dir}/munge", owner=s.munge_user, group=s.munge_grp, mode=700)
-
-    # Set up slurm
-    ilib.user(s.slurm_user, comment="User to run slurmctld", shell="/bin/false")
-
     # add slurm to cyclecloud so it has access to jetpack / userdata
     if os.path.exists("/opt/cycle/jetpack"):
         ilib.group_members("cyclecloud", members=[s.slurm_user], append=True)
 
-    ilib.directory("/var/spool/slurmd", owner=s.slurm_user, group=s.slurm_grp)
-
-    ilib.directory("/var/log/slurmd", owner=s.slurm_user, group=s.slurm_grp)
-    ilib.directory("/var/log/slurmctld", owner=s.slurm_user, group=s.slurm_grp)
-
 
 def munge_key(s: InstallSettings) -> None:
 
-    ilib.directory(
-        "/etc/munge", owner=s.munge_user, group=s.munge_grp, mode=700, recursive=True
-    )
+    ilib.directories_bulk([("/etc/munge", s.munge_user, s.munge_grp, 700, True)])
 
-    if s.mode == "scheduler" and not os.path.exists(f"{s.config_dir}/munge.key"):
+    if s.mode == "scheduler" and not os.path.exists(s.munge_key_path):
         # TODO only should do this on the primary
         # we should skip this for secondary HA nodes
-        with open("/dev/urandom", "rb") as fr:
-            buf = bytes()
-            while len(buf) < 1024:
-                buf = buf + fr.read(1024 - len(buf))
+        buf = os.urandom(1024)
         ilib.file(
-            f"{s.config_dir}/munge.key",
+            s.munge_key_path,
             content=buf,
             owner=s.munge_user,
             group=s.munge_grp,
@@ -205,7 +237,7 @@ def munge_key(s: InstallSettings) -> None:
         )
 
     ilib.copy_file(
-        f"{s.config_dir}/munge.key",
+        s.munge_key_path,
         "/etc/munge/munge.key",
         owner=s.munge_user,
         group=s.munge_grp,
@@ -234,7 +266,7 @@ def _accounting_primary(s: InstallSettings) -> None:
     if not s.acct_enabled:
         logging.info("slurm.accounting.enabled is false, skipping this step.")
         ilib.file(
-            f"{s.config_dir}/accounting.conf",
+            s.accounting_conf_path,
             owner=s.slurm_user,
             group=s.slurm_grp,
             content="AccountingStorageType=accounting_storage/none",
@@ -242,7 +274,7 @@ def _accounting_primary(s: InstallSettings) -> None:
         return
 
     ilib.file(
-        f"{s.config_dir}/accounting.conf",
+        s.accounting_conf_path,
         owner=s.slurm_user,
         group=s.slurm_grp,
         content=f"""
@@ -255,23 +287,19 @@ AccountingStorageTRES=gres/gpu
     # Previously this was required when connecting to any Azure MariaDB instance.
     # Which is why we shipped with LOCAL_AZURE_CA_PEM.
     if s.acct_cert_url and s.acct_cert_url != LOCAL_AZURE_CA_PEM:
-        logging.info(f"Downloading {s.acct_cert_url} to {s.config_dir}/AzureCA.pem")
-        subprocess.check_call(
-            [
-                "wget",
-                "-O",
-                f"{s.config_dir}/AzureCA.pem",
-                s.acct_cert_url,
-            ]
-        )
+        logging.info(f"Downloading {s.acct_cert_url} to {s.azure_ca_pem_path}")
+        with urllib.request.urlopen(s.acct_cert_url, timeout=30) as fr, open(
+            s.azure_ca_pem_path, "wb"
+        ) as fw:
+            shutil.copyfileobj(fr, fw, length=65536)
         ilib.chown(
-            f"{s.config_dir}/AzureCA.pem", owner=s.slurm_user, group=s.slurm_grp
+            s.azure_ca_pem_path, owner=s.slurm_user, group=s.slurm_grp
         )
-        ilib.chmod(f"{s.config_dir}/AzureCA.pem", mode="0600")
+        ilib.chmod(s.azure_ca_pem_path, mode="0600")
     elif s.acct_cert_url and s.acct_cert_url == LOCAL_AZURE_CA_PEM:
         ilib.copy_file(
             LOCAL_AZURE_CA_PEM,
-            f"{s.config_dir}/AzureCA.pem",
+            s.azure_ca_pem_path,
             owner=s.slurm_user,
             group=s.slurm_grp,
             mode="0600",
@@ -279,7 +307,7 @@ AccountingStorageTRES=gres/gpu
 
     # Configure slurmdbd.conf
     ilib.template(
-        f"{s.config_dir}/slurmdbd.conf",
+        s.slurmdbd_conf_path,
         owner=s.slurm_user,
         group=s.slurm_grp,
         source="templates/slurmdbd.conf.template",
@@ -299,12 +327,12 @@ AccountingStorageTRES=gres/gpu
 
     if s.secondary_scheduler_name:
         ilib.append_file(
-            f"{s.config_dir}/accounting.conf",
+            s.accounting_conf_path,
             content=f"AccountingStorageBackupHost={secondary_scheduler.hostname}\n",
             comment_prefix="\n# Additional HA Storage Backup host -"
         )
         ilib.append_file(
-            f"{s.config_dir}/slurmdbd.conf",
+            s.slurmdbd_conf_path,
             content=f"DbdBackupHost={secondary_scheduler.hostname}\n",
             comment_prefix="\n# Additional HA dbd host -"
         )
@@ -316,10 +344,9 @@ def _accounting_all(s: InstallSettings) -> None:
     """
     # This used to be required for all installations, but it is
     # now optional, so only create the link if required.
-    original_azure_ca_pem = f"{s.config_dir}/AzureCA.pem"
-    if os.path.exists(original_azure_ca_pem):
+    if os.path.exists(s.azure_ca_pem_path):
         ilib.link(
-            f"{s.config_dir}/AzureCA.pem",
+            s.azure_ca_pem_path,
             "/etc/slurm/AzureCA.pem",
             owner=s.slurm_user,
             group=s.slurm_grp,
@@ -327,7 +354,7 @@ def _accounting_all(s: InstallSettings) -> None:
 
     # Link shared slurmdbd.conf to real config file location
     ilib.link(
-        f"{s.config_dir}/slurmdbd.conf",
+        s.slurmdbd_conf_path,
         "/etc/slurm/slurmdbd.conf",
         owner=s.slurm_user,
         group=s.slurm_grp,
@@ -363,7 +390,7 @@ def _complete_install_primary(s: InstallSettings) -> None:
         ilib.directory(state_save_location, owner=s.slurm_user, group=s.slurm_grp)
 
     ilib.template(
-        f"{s.config_dir}/slurm.conf",
+        s.slurm_conf_path,
         owner=s.slurm_user,
         group=s.slurm_grp,
         mode="0644",
@@ -376,95 +403,86 @@ def _complete_install_primary(s: InstallSettings) -> None:
         },
     )
 
+    slurm_conf_parts = []
     if secondary_scheduler:
-        ilib.append_file(
-            f"{s.config_dir}/slurm.conf",
-            content=f"SlurmCtldHost={secondary_scheduler.hostname}({secondary_scheduler.private_ipv4})\n",
-            comment_prefix="\n# Additional HA scheduler host -",
+        slurm_conf_parts.append(
+            (
+                f"SlurmCtldHost={secondary_scheduler.hostname}({secondary_scheduler.private_ipv4})\n",
+                "\n# Additional HA scheduler host -",
+            )
         )
 
     if s.additonal_slurm_config:
-        ilib.append_file(
-            f"{s.config_dir}/slurm.conf",
-            content=s.additonal_slurm_config,
-            comment_prefix="\n# Additional config from CycleCloud -",
+        slurm_conf_parts.append(
+            (s.additonal_slurm_config, "\n# Additional config from CycleCloud -")
         )
 
-    ilib.template(
-        f"{s.config_dir}/cgroup.conf",
-        owner=s.slurm_user,
-        group=s.slurm_grp,
-        source=f"templates/cgroup.conf.template",
-        mode="0644",
-    )
+    if slurm_conf_parts:
+        ilib.append_file_parts(s.slurm_conf_path, slurm_conf_parts)
 
-    if not os.path.exists(f"{s.config_dir}/azure.conf"):
-        ilib.file(
-            f"{s.config_dir}/azure.conf",
+    # The remaining files are independent of slurm.conf and each other, so
+    # write them concurrently.
+    tasks: List[Callable[[], None]] = [
+        lambda: ilib.template(
+            s.cgroup_conf_path,
             owner=s.slurm_user,
             group=s.slurm_grp,
+            source=f"templates/cgroup.conf.template",
             mode="0644",
-            content="",
         )
-
-    if not os.path.exists(f"{s.config_dir}/keep_alive.conf"):
-        ilib.file(
-            f"{s.config_dir}/keep_alive.conf",
-            owner=s.slurm_user,
-            group=s.slurm_grp,
-            mode="0644",
-            content="# Do not edit this file. It is managed by azslurm",
+    ]
+
+    if not os.path.exists(s.azure_conf_path):
+        tasks.append(
+            lambda: ilib.file(
+                s.azure_conf_path,
+                owner=s.slurm_user,
+                group=s.slurm_grp,
+                mode="0644",
+                content="",
+            )
         )
 
-    if not os.path.exists(f"{s.config_dir}/gres.conf"):
-        ilib.file(
-            f"{s.config_dir}/gres.conf",
-            owner=s.slurm_user,
-            group=s.slurm_grp,
-            mode="0644",
-            content="",
+    if not os.path.exists(s.keep_alive_conf_path):
+        tasks.append(
+            lambda: ilib.file(
+                s.keep_alive_conf_path,
+                owner=s.slurm_user,
+                group=s.slurm_grp,
+                mode="0644",
+                content="# Do not edit this file. It is managed by azslurm",
+            )
         )
 
-def _complete_install_all(s: InstallSettings) -> None:
-    ilib.link(
-        f"{s.config_dir}/gres.conf",
-        "/etc/slurm/gres.conf",
-        owner=s.slurm_user,
-        group=s.slurm_grp,
-    )
-
-    ilib.link(
-        f"{s.config_dir}/slurm.conf",
-        "/etc/slurm/slurm.conf",
-        owner=s.slurm_user,
-        group=s.slurm_grp,
-    )
-
-    ilib.link(
-        f"{s.config_dir}/cgroup.conf",
-        "/etc/slurm/cgroup.conf",
-        owner=s.slurm_user,
-        group=s.slurm_grp,
-    )
-
-    ilib.link(
-        f"{s.config_dir}/azure.conf",
-        "/etc/slurm/azure.conf",
-        owner=s.slurm_user,
-        group=s.slurm_grp,
-    )
+    if not os.path.exists(s.gres_conf_path):
+        tasks.append(
+            lambda: ilib.file(
+                s.gres_conf_path,
+                owner=s.slurm_user,
+                group=s.slurm_grp,
+                mode="0644",
+                content="",
+            )
+        )
 
-    ilib.link(
-        f"{s.config_dir}/keep_alive.conf",
-        "/etc/slurm/keep_alive.conf",
-        owner=s.slurm_user,
-        group=s.slurm_grp,
-    )
+    with ThreadPoolExecutor(max_workers=len(tasks)) as executor:
+        # list() so that any exception is re-raised here
+        list(executor.map(lambda task: task(), tasks))
 
-    # Link the accounting.conf regardless
-    ilib.link(
-        f"{s.config_dir}/accounting.conf",
-        "/etc/slurm/accounting.conf",
+def _complete_install_all(s: InstallSettings) -> None:
+    ilib.links_bulk(
+        [
+            (conf_path, f"/etc/slurm/{os.path.basename(conf_path)}")
+            for conf_path in [
+                s.gres_conf_path,
+                s.slurm_conf_path,
+                s.cgroup_conf_path,
+                s.azure_conf_path,
+                s.keep_alive_conf_path,
+                # Link the accounting.conf regardless
+                s.accounting_conf_path,
+            ]
+        ],
         owner=s.slurm_user,
         group=s.slurm_grp,
     )
@@ -504,8 +522,8 @@ def setup_slurmd(s: InstallSettings) -> None:
     slurmd_config = f"SLURMD_OPTIONS=-b -N {s.node_name}"
     if s.dynamic_config:
         slurmd_config = f"SLURMD_OPTIONS={s.dynamic_config} -N {s.node_name}"
-        if "-b" not in slurmd_config.split():
-            slurmd_config = slurmd_config + " -b"
+        if not _SLURMD_B_FLAG_RE.search(slurmd_config):
+            slurmd_config += " -b"
 
     ilib.file(
         "/etc/sysconfig/slurmd" if s.platform_family == "rhel" else "/etc/default/slurmd",
@@ -558,12 +576,47 @@ def _is_at_least_ubuntu22() -> bool:
     return False
 
 
+def _jetpack_config() -> Dict:
+    """
+    jetpack is slow to start, so we cache its output under /run (tmpfs) and
+    only invoke it again when jetpack's own node config has been modified.
+    """
+    try:
+        if os.path.getmtime(JETPACK_CONFIG_CACHE) >= os.path.getmtime(JETPACK_NODE_CONFIG):
+            with open(JETPACK_CONFIG_CACHE, "rb") as fr:
+                return _json_loads(fr.read())
+    except (OSError, ValueError):
+        pass
+
+    cmd = ["jetpack", "config", "--json"]
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE) as proc:
+        # read straight from the pipe rather than through check_output's buffering
+        raw = proc.stdout.read()  # type: ignore
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd)
+    config = _json_loads(raw)
+
+    try:
+        os.makedirs(os.path.dirname(JETPACK_CONFIG_CACHE), mode=0o700, exist_ok=True)
+        tmp_cache = JETPACK_CONFIG_CACHE + ".tmp"
+        # the config contains credentials, so never let it be world readable.
+        fd = os.open(tmp_cache, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as fw:
+            fw.write(raw)
+        os.chmod(tmp_cache, 0o600)
+        os.replace(tmp_cache, JETPACK_CONFIG_CACHE)
+    except OSError as e:
+        logging.warning(f"Could not cache jetpack config at {JETPACK_CONFIG_CACHE}: {e}")
+
+    return config
+
+
 def _load_config(bootstrap_config: str) -> Dict:
     if bootstrap_config == "jetpack":
-        config = json.loads(subprocess.check_output(["jetpack", "config", "--json"]))
+        config = _jetpack_config()
     else:
-        with open(bootstrap_config) as fr:
-            config = json.load(fr)
+        with open(bootstrap_config, "rb") as fr:
+            config = _json_loads(fr.read())
 
     if "cluster_name" not in config:
         config["cluster_name"] = config["cyclecloud"]["cluster"]["name"]
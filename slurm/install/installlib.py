@@ -1,4 +1,5 @@
 import base64
+import functools
 import grp
 from hashlib import md5
 import json
@@ -9,6 +10,7 @@ import re
 import shutil
 from ssl import SSLContext
 import ssl
+import stat
 import subprocess
 import tempfile
 from time import sleep as _sleep
@@ -29,6 +31,19 @@ class ConvergeRetry(RuntimeError):
     pass
 
 
+class _LazyJoin:
+    """
+    Defers sep.join(seq) until a log record is actually emitted.
+    """
+
+    def __init__(self, sep: str, seq: List[str]) -> None:
+        self.sep = sep
+        self.seq = seq
+
+    def __str__(self) -> str:
+        return self.sep.join(self.seq)
+
+
 class Clock:
     def time(self) -> float:
         return datetime.now(timezone.utc).timestamp()
@@ -96,6 +111,57 @@ def link(
         logging.info("Link {dst} already exists".format(**locals()))
 
 
+def links_bulk(
+    pairs: List[Tuple[str, str]],
+    owner: Optional[str] = None,
+    group: Optional[str] = None,
+) -> None:
+    """
+    Same as link, but for many (src, dst) pairs sharing the same owner/group.
+    The owner and group are only resolved once for the whole batch.
+    """
+    uid, gid = _resolve_ids(owner, group)
+
+    for src, dst in pairs:
+        try:
+            os.symlink(src, dst)
+            logging.info(f"Linking {dst} to {src}")
+        except FileExistsError:
+            if not os.path.islink(dst):
+                raise
+            logging.info(f"Link {dst} already exists")
+            if os.readlink(dst) != src or _is_converged(os.lstat(dst), uid, gid, None):
+                continue
+        if uid != -1 or gid != -1:
+            os.lchown(dst, uid, gid)
+
+
+@functools.lru_cache(maxsize=32)
+def _getpwnam(name: str) -> pwd.struct_passwd:
+    # NSS lookups may hit SSSD/LDAP, and we resolve the same few users over and over.
+    return pwd.getpwnam(name)
+
+
+@functools.lru_cache(maxsize=32)
+def _getgrnam(name: str) -> grp.struct_group:
+    return grp.getgrnam(name)
+
+
+def _resolve_ids(owner: Optional[str], group: Optional[str]) -> Tuple[int, int]:
+    """
+    Returns (uid, gid) for owner/group, using -1 for anything unset so the
+    result can be passed straight to os.chown. Like chown, the gid defaults to
+    the owner's primary group.
+    """
+    uid = gid = -1
+    if owner:
+        pwd_record = _getpwnam(owner)
+        uid, gid = pwd_record.pw_uid, pwd_record.pw_gid
+    if group:
+        gid = _getgrnam(group).gr_gid
+    return uid, gid
+
+
 def chown(
     dest: str,
     owner: Optional[str] = None,
@@ -105,12 +171,12 @@ def chown(
     pwd_record = uid = gid = None
 
     if owner:
-        pwd_record = pwd.getpwnam(owner)
+        pwd_record = _getpwnam(owner)
         uid = pwd_record.pw_uid
         gid = pwd_record.pw_gid
 
     if group:
-        gid = grp.getgrnam(group).gr_gid
+        gid = _getgrnam(group).gr_gid
     elif pwd_record:
         group = pwd_record.pw_name
 
@@ -133,7 +199,7 @@ def chmod(dest: str, mode: Optional[Union[str, int]], recursive: bool = False) -
             cmd = ["chmod", "-R", str(mode), dest]
         else:
             cmd = ["chmod", str(mode), dest]
-        logging.info(" ".join(cmd))
+        logging.info("%s", _LazyJoin(" ", cmd))
         subprocess.check_call(cmd)
         # os.chmod(dest, mode)
 
@@ -146,10 +212,29 @@ def copy_file(
     source: str, dest: str, owner: str, group: str, mode: Union[str, int]
 ) -> None:
     shutil.copyfile(src=source, dst=dest)
+    with open(dest, "rb") as fr:
+        _release_page_cache(fr.fileno())
     chown(dest, owner=owner, group=group)
     chmod(dest, mode)
 
 
+# most files we write are a few KB, where an fsync costs more than it frees
+_RELEASE_PAGE_CACHE_MIN_SIZE = 8 * 1024 * 1024
+
+
+def _release_page_cache(fd: int) -> None:
+    """
+    Large files we write are rarely read back during the install, so sync them
+    and tell the kernel it can drop them from the page cache, leaving more room
+    for the package installs on memory-tight VMs. Small files are left alone.
+    """
+    if os.fstat(fd).st_size < _RELEASE_PAGE_CACHE_MIN_SIZE:
+        return
+    os.fsync(fd)
+    if hasattr(os, "posix_fadvise"):
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+
+
 def file(
     dest: str,
     content: Union[bytes, str] = "",
@@ -161,6 +246,8 @@ def file(
     tmp_dest = dest + ".tmp"
     with open(tmp_dest, io_mode) as fw:
         fw.write(content)
+        fw.flush()
+        _release_page_cache(fw.fileno())
     chown(tmp_dest, owner, group)
     chmod(tmp_dest, mode)
     move(tmp_dest, dest)
@@ -172,14 +259,33 @@ def append_file(dest: str, content: str, comment_prefix: str) -> None:
     This relies on the fact that we can append "md5 = <hash>" to the end
     of the comment to prevent duplicate appends.
     """
-    hash = md5(content.encode()).hexdigest()
+    append_file_parts(dest, [(content, comment_prefix)])
+
+
+def append_file_parts(dest: str, parts: List[Tuple[str, str]]) -> None:
+    """
+    Same as append_file, but for several (content, comment_prefix) pairs.
+    dest is read once and everything not already written is appended in a
+    single write.
+    """
     with open(dest, "r") as fr:
-        already_written = hash in fr.read()
-    if not already_written:
+        existing = fr.read()
+
+    to_write = []
+    # like re-reading dest between appends, a part repeated in parts is written once
+    appended = set()
+    for content, comment_prefix in parts:
+        hash = md5(content.encode()).hexdigest()
+        if hash in existing or hash in appended:
+            continue
+        appended.add(hash)
         logging.info(f"Appending to {dest}: content='{content}'")
+        to_write.append(f"{comment_prefix} md5 = {hash}\n")
+        to_write.append(content)
+
+    if to_write:
         with open(dest, "a") as fa:
-            fa.write(f"{comment_prefix} md5 = {hash}\n")
-            fa.write(content)
+            fa.write("".join(to_write))
 
 
 def move(src: str, dest: str) -> None:
@@ -197,6 +303,15 @@ def cookbook_file(
     copy_file(full_source, dest, owner, group, mode)
 
 
+@functools.lru_cache(maxsize=32)
+def _read_template(source: str) -> str:
+    if not os.path.exists(source):
+        raise ConvergeError(f"Template {source} does not exist!")
+
+    with open(source) as fr:
+        return fr.read()
+
+
 def template(
     dest: str,
     owner: str,
@@ -213,11 +328,7 @@ def template(
     if isinstance(mode, str):
         mode = int(mode)
 
-    if not os.path.exists(source):
-        raise ConvergeError(f"Template {source} does not exist!")
-
-    with open(source) as fr:
-        contents = fr.read()
+    contents = _read_template(source)
 
     with open(dest, "w") as fw:
         fw.write(contents.format(**variables))
@@ -228,11 +339,13 @@ def template(
 
 
 def group(group_name: str, gid: Optional[int]) -> None:
-    groups = dict([(g.gr_name, g.gr_gid) for g in grp.getgrall()])
-    if group_name in groups:
+    try:
+        grp.getgrnam(group_name)
         # group already exists
         # TODO logging
         return
+    except KeyError:
+        pass
     if gid is not None:
         cmd = ["groupadd", "-g", str(gid), group_name]
     else:
@@ -253,9 +366,11 @@ def user(
     uid: Optional[int] = None,
     gid: Optional[int] = None,
 ) -> None:
-    users = dict([(p.pw_name, p.pw_uid) for p in pwd.getpwall()])
-    if user_name in users:
+    try:
+        pwd.getpwnam(user_name)
         return
+    except KeyError:
+        pass
     logging.info(comment)
     cmd = ["useradd"]
     if uid:
@@ -298,10 +413,72 @@ def directory(
 
     if not os.path.exists(path):
         os.makedirs(path)
+    elif not recursive:
+        uid, gid = _resolve_ids(owner, group)
+        if _is_converged(os.stat(path), uid, gid, _int_mode(mode)):
+            logging.info(f"directory {path} already has the expected owner and mode")
+            return
     chown(path, owner, group, recursive)
     chmod(path, mode, recursive)
 
 
+def directories_bulk(
+    dirs: List[
+        Tuple[str, Optional[str], Optional[str], Optional[Union[str, int]], bool]
+    ]
+) -> None:
+    """
+    Same as directory, but for a table of (path, owner, group, mode, recursive).
+    Each distinct owner/group is only resolved once, and ownership and mode are
+    applied in-process rather than by shelling out to chmod.
+    Like directory, mode is given in chmod notation, e.g. 755 or "0700", and like
+    chown, ownership is left alone unless both ids resolve to a non-root user.
+    Symlinks are never followed: links get lchown'd and are skipped for chmod.
+    """
+    ids: Dict[Tuple[Optional[str], Optional[str]], Tuple[int, int]] = {}
+    for path, owner, group, mode, recursive in dirs:
+        if not os.path.exists(path):
+            os.makedirs(path)
+
+        if (owner, group) not in ids:
+            ids[(owner, group)] = _resolve_ids(owner, group)
+        uid, gid = ids[(owner, group)]
+        # matches chown's `if uid and gid`, which never chowns to root
+        do_chown = uid > 0 and gid > 0
+        int_mode = _int_mode(mode)
+
+        paths = [path]
+        if recursive:
+            for root, subdirs, files in os.walk(path):
+                paths.extend(os.path.join(root, x) for x in subdirs + files)
+
+        logging.info(f"directory {path} owner={owner} group={group} mode={mode} recursive={recursive}")
+        for sub_path in paths:
+            st = os.lstat(sub_path)
+            if do_chown and not _is_converged(st, uid, gid, None):
+                os.chown(sub_path, uid, gid, follow_symlinks=False)
+            if stat.S_ISLNK(st.st_mode):
+                continue
+            if int_mode is not None and stat.S_IMODE(st.st_mode) != int_mode:
+                os.chmod(sub_path, int_mode)
+
+
+def _int_mode(mode: Optional[Union[str, int]]) -> Optional[int]:
+    # modes are written in chmod notation, i.e. 755 or "0755" both mean 0o755
+    return int(str(mode), 8) if mode is not None else None
+
+
+def _is_converged(st: os.stat_result, uid: int, gid: int, mode: Optional[int]) -> bool:
+    """
+    True if st already has the uid/gid (-1 meaning "don't care") and mode.
+    """
+    if uid != -1 and st.st_uid != uid:
+        return False
+    if gid != -1 and st.st_gid != gid:
+        return False
+    return mode is None or stat.S_IMODE(st.st_mode) == mode
+
+
 def create_service(
     name: str,
     exec_start: str,
@@ -465,7 +642,7 @@ def _unchecked_output(cmd: List[str]) -> str:
     try:
         return subprocess.check_output(cmd).decode()
     except Exception as e:
-        logging.debug(f"attempt to run {' '.join(cmd)} failed: {e}")
+        logging.debug("attempt to run %s failed: %s", _LazyJoin(" ", cmd), e)
         return ""
 
 
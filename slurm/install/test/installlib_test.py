@@ -2,6 +2,7 @@ from copy import deepcopy
 import installlib
 from installlib import CCNode
 import logging
+import os
 from typing import Dict
 import pytest
 
@@ -210,4 +211,115 @@ def test_await_node_hostname_nodename_as_hostname(mock_clock) -> None:
         software_configuration=soft_config,
     )
 
-    assert actual.to_dict() == expected.to_dict()
\ No newline at end of file
+    assert actual.to_dict() == expected.to_dict()
+
+def test_links_bulk(tmp_path) -> None:
+    pairs = []
+    for name in ["a.conf", "b.conf"]:
+        src = tmp_path / name
+        src.write_text(name)
+        pairs.append((str(src), str(tmp_path / f"link-{name}")))
+
+    installlib.links_bulk(pairs)
+    for src, dst in pairs:
+        assert os.readlink(dst) == src
+
+    # re-running is a no-op
+    installlib.links_bulk(pairs)
+
+    # but we do not silently skip a real file in the way
+    not_a_link = tmp_path / "not-a-link"
+    not_a_link.write_text("")
+    with pytest.raises(FileExistsError):
+        installlib.links_bulk([(pairs[0][0], str(not_a_link))])
+
+
+def test_directories_bulk(tmp_path) -> None:
+    top = tmp_path / "top"
+    nested = top / "nested"
+    nested.mkdir(parents=True)
+    (nested / "file").write_text("")
+    other = tmp_path / "new" / "dir"
+
+    installlib.directories_bulk(
+        [
+            (str(top), None, None, 700, True),
+            (str(other), None, None, "0755", False),
+        ]
+    )
+
+    assert os.stat(top).st_mode & 0o777 == 0o700
+    assert os.stat(nested).st_mode & 0o777 == 0o700
+    assert os.stat(nested / "file").st_mode & 0o777 == 0o700
+    assert os.path.isdir(other)
+    assert os.stat(other).st_mode & 0o777 == 0o755
+
+
+def test_directories_bulk_root_owner_and_symlinks(tmp_path) -> None:
+    top = tmp_path / "top"
+    top.mkdir()
+    log = top / "munged.log"
+    log.write_text("")
+    outside = tmp_path / "outside"
+    outside.write_text("")
+    outside.chmod(0o644)
+    (top / "link").symlink_to(outside)
+    if os.geteuid() == 0:
+        os.chown(top, 1234, 1234)
+        os.chown(log, 1234, 1234)
+
+    # like chown, an owner of root leaves ownership alone and only applies the mode
+    installlib.directories_bulk([(str(top), "root", "root", 700, True)])
+
+    assert os.stat(log).st_mode & 0o777 == 0o700
+    if os.geteuid() == 0:
+        assert os.stat(top).st_uid == 1234
+        assert os.stat(log).st_uid == 1234
+    # symlinks are not followed
+    assert os.stat(outside).st_mode & 0o777 == 0o644
+
+
+def test_append_file_parts(tmp_path) -> None:
+    dest = tmp_path / "slurm.conf"
+    dest.write_text("ClusterName=c1\n")
+
+    parts = [("A=1\n", "\n# first -"), ("B=2\n", "\n# second -")]
+    installlib.append_file_parts(str(dest), parts)
+    once = dest.read_text()
+    assert once.startswith("ClusterName=c1\n\n# first - md5 = ")
+    assert "A=1\n" in once and once.endswith("B=2\n")
+
+    # appending is monotonic, even when the parts are split up
+    installlib.append_file_parts(str(dest), parts)
+    installlib.append_file(str(dest), "B=2\n", "\n# second -")
+    assert dest.read_text() == once
+
+
+def test_append_file_parts_repeated(tmp_path) -> None:
+    dest = tmp_path / "slurm.conf"
+    dest.write_text("ClusterName=c1\n")
+
+    installlib.append_file_parts(
+        str(dest), [("A=1\n", "\n# first -"), ("A=1\n", "\n# again -")]
+    )
+    contents = dest.read_text()
+    assert contents.count("A=1\n") == 1
+    assert "# again -" not in contents
+
+
+def test_directory_already_converged(tmp_path, monkeypatch) -> None:
+    path = tmp_path / "already"
+    path.mkdir()
+    os.chmod(path, 0o711)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("should not have been called")
+
+    monkeypatch.setattr(installlib, "chmod", fail)
+    monkeypatch.setattr(installlib, "chown", fail)
+    installlib.directory(str(path), mode=711)
+
+    monkeypatch.undo()
+    os.chmod(path, 0o700)
+    installlib.directory(str(path), mode=711)
+    assert os.stat(path).st_mode & 0o777 == 0o711
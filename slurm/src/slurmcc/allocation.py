@@ -2,7 +2,8 @@
 # Licensed under the MIT License.
 #
 import logging
-from typing import Callable, Dict, List, Set, Tuple
+from collections import Counter
+from typing import Callable, Dict, List, Set, Tuple, Union
 
 from hpc.autoscale import util as hpcutil
 from hpc.autoscale import clock
@@ -23,12 +24,12 @@ def resume(
     node_list: List[str],
     partitions: List[partitionlib.Partition],
 ) -> BootupResult:
-    name_to_partition = {}
-    for partition in partitions:
-        for name in partition.all_nodes():
-            name_to_partition[name] = partition
-    
-    existing_nodes_by_name = hpcutil.partition(node_mgr.get_nodes(), lambda n: n.name)
+    name_to_partition = _build_name_to_partition(partitions)
+
+    # names are unique, so avoid building a list per name. First one wins, as before.
+    existing_nodes_by_name: Dict[str, Node] = {}
+    for node in node_mgr.get_nodes():
+        existing_nodes_by_name.setdefault(node.name, node)
 
     nodes = []
     unknown_node_names = []
@@ -41,7 +42,7 @@ def resume(
     
     for name in node_list:
         if name in existing_nodes_by_name:
-            node = existing_nodes_by_name[name][0]
+            node = existing_nodes_by_name[name]
             if node.state != "Deallocated":
                 logging.info(f"{name} already exists.")
                 continue
@@ -75,6 +76,16 @@ def resume(
     return boot_result
 
 
+def _build_name_to_partition(
+    partitions: List[partitionlib.Partition],
+) -> Dict[str, partitionlib.Partition]:
+    name_to_partition = {}
+    for partition in partitions:
+        for name in partition.all_nodes():
+            name_to_partition[name] = partition
+    return name_to_partition
+
+
 def wait_for_nodes_to_terminate(
     bindings: ClusterBindingInterface, node_list: List[str]
 ) -> None:
@@ -113,16 +124,27 @@ class WaitForResume:
         self, node_list: List[str], latest_nodes: List[Node]
     ) -> Tuple[Dict, List[Node]]:
         ready_nodes = []
-        states = {}
+        states: Counter = Counter()
+        unknown_states: Counter = Counter()
 
-        by_name = hpcutil.partition_single(latest_nodes, lambda node: node.name)
+        # rebuilt once per call, so each name in node_list is a single dict lookup
+        by_name = {node.name: node for node in latest_nodes}
 
         relevant_nodes: List[Node] = []
 
         recovered_node_names: Set[str] = set()
 
+        # recovered nodes that are not dynamic, i.e. need to be set back to idle
+        recovered_static_node_names: List[str] = []
+
         newly_failed_node_names: List[str] = []
 
+        # failed nodes whose NodeAddr/NodeHostName need to be reset to their name
+        reset_addr_node_names: List[str] = []
+
+        # (name, private_ip) for nodes whose NodeAddr/NodeHostName need to be the ip
+        ip_updates: List[Tuple[str, str]] = []
+
         deleted_nodes = []
 
         for name in node_list:
@@ -138,11 +160,11 @@ class WaitForResume:
             state = node.state
 
             if state and state.lower() == "failed":
-                states["Failed"] = states.get("Failed", 0) + 1
+                states["Failed"] += 1
                 if name not in self.failed_node_names:
                     newly_failed_node_names.append(name)
                     if not is_dynamic:
-                        slutil.scontrol(["update", f"NodeName={name}", f"NodeAddr={name}", f"NodeHostName={name}"])
+                        reset_addr_node_names.append(name)
                     self.failed_node_names.add(name)
 
                 continue
@@ -153,22 +175,15 @@ class WaitForResume:
             if not use_nodename_as_hostname:
                 ip_already_set_key = (name, node.private_ip)
                 if node.private_ip and ip_already_set_key not in self.ip_already_set:
-                    slutil.scontrol(
-                        [
-                            "update",
-                            "NodeName=%s" % name,
-                            "NodeAddr=%s" % node.private_ip,
-                            "NodeHostName=%s" % node.private_ip,
-                        ]
-                    )
-                    self.ip_already_set.add(ip_already_set_key)
+                    ip_updates.append(ip_already_set_key)
 
             if name in self.failed_node_names:
                 recovered_node_names.add(name)
+                if not is_dynamic:
+                    recovered_static_node_names.append(name)
 
             if node.target_state != "Started":
-                states["UNKNOWN"] = states.get("UNKNOWN", {})
-                states["UNKNOWN"][node.state] = states["UNKNOWN"].get(state, 0) + 1
+                unknown_states[node.state] += 1
                 continue
 
             if node.state == "Ready":
@@ -177,7 +192,25 @@ class WaitForResume:
                 else:
                     ready_nodes.append(node)
 
-            states[state] = states.get(state, 0) + 1
+            states[state] += 1
+
+        if unknown_states:
+            states["UNKNOWN"] = unknown_states
+
+        # Each of the following is a single scontrol call for all affected nodes,
+        # rather than one call per node.
+        if reset_addr_node_names:
+            scontrol_update(
+                reset_addr_node_names,
+                NodeAddr=reset_addr_node_names,
+                NodeHostName=reset_addr_node_names,
+            )
+
+        if ip_updates:
+            ip_names = [name for name, _ in ip_updates]
+            ips = [ip for _, ip in ip_updates]
+            scontrol_update(ip_names, NodeAddr=ips, NodeHostName=ips)
+            self.ip_already_set.update(ip_updates)
 
         if newly_failed_node_names:
             failed_node_names_str = ",".join(self.failed_node_names)
@@ -185,15 +218,11 @@ class WaitForResume:
                 logging.error(
                     "The following nodes failed to start: %s", failed_node_names_str
                 )
-                for failed_name in self.failed_node_names:
-                    slutil.scontrol(
-                        [
-                            "update",
-                            "NodeName=%s" % failed_name,
-                            "State=down",
-                            "Reason=cyclecloud_node_failure",
-                        ]
-                    )
+                scontrol_update(
+                    sorted(self.failed_node_names),
+                    State="down",
+                    Reason="cyclecloud_node_failure",
+                )
             except Exception:
                 logging.exception(
                     "Failed to mark the following nodes as down: %s. Will re-attempt next iteration.",
@@ -203,22 +232,17 @@ class WaitForResume:
         if recovered_node_names:
             recovered_node_names_str = ",".join(recovered_node_names)
             try:
-                for recovered_name in recovered_node_names:
-                    logging.error(
-                        "The following nodes have recovered from failure: %s",
-                        recovered_node_names_str,
+                logging.error(
+                    "The following nodes have recovered from failure: %s",
+                    recovered_node_names_str,
+                )
+                if recovered_static_node_names:
+                    scontrol_update(
+                        recovered_static_node_names,
+                        State="idle",
+                        Reason="cyclecloud_node_recovery",
                     )
-                    if not is_dynamic:
-                        slutil.scontrol(
-                            [
-                                "update",
-                                "NodeName=%s" % recovered_name,
-                                "State=idle",
-                                "Reason=cyclecloud_node_recovery",
-                            ]
-                        )
-                    if recovered_name in self.failed_node_names:
-                        self.failed_node_names.remove(recovered_name)
+                self.failed_node_names.difference_update(recovered_node_names)
             except Exception:
                 logging.exception(
                     "Failed to mark the following nodes as recovered: %s. Will re-attempt next iteration.",
@@ -228,6 +252,67 @@ class WaitForResume:
         return (states, ready_nodes)
 
 
+# keeps a single NodeName= argument well under the kernel's per-argument limit
+_SCONTROL_UPDATE_BATCH_SIZE = 1000
+
+
+def scontrol_update(
+    node_names: List[str], retry: bool = True, **attrs: Union[str, List[str]]
+) -> str:
+    """
+    Runs `scontrol update NodeName=a,b,c ...` for all of node_names, one call per
+    _SCONTROL_UPDATE_BATCH_SIZE nodes. List values are joined with commas, and like
+    NodeName=lx[0-7] NodeAddr=elx[0-7], scontrol matches them to node_names in order.
+    """
+    assert node_names
+    for key, value in attrs.items():
+        if isinstance(value, list):
+            assert len(value) == len(node_names), f"{key} does not match NodeName"
+
+    outputs = []
+    for start in range(0, len(node_names), _SCONTROL_UPDATE_BATCH_SIZE):
+        end = start + _SCONTROL_UPDATE_BATCH_SIZE
+        args = ["update", "NodeName=%s" % ",".join(node_names[start:end])]
+        for key, value in attrs.items():
+            if isinstance(value, list):
+                value = ",".join(value[start:end])
+            args.append(f"{key}={value}")
+        outputs.append(slutil.scontrol(args, retry=retry))
+    return "".join(outputs)
+
+
+# each poll rebuilds the NodeManager over REST, so never poll faster than every 5s
+_RESUME_POLL_MIN_INTERVAL = 5.0
+_RESUME_POLL_MAX_INTERVAL = 30.0
+
+
+def _resume_poll_max_interval() -> float:
+    """
+    Never sleep longer than a quarter of ResumeTimeout, so a node that comes up
+    late is still noticed well before slurmctld gives up on it.
+    """
+    resume_timeout = slutil.get_slurm_config().get("ResumeTimeout", "")
+    if not resume_timeout.isdigit() or int(resume_timeout) <= 0:
+        return _RESUME_POLL_MAX_INTERVAL
+    return max(
+        _RESUME_POLL_MIN_INTERVAL,
+        min(_RESUME_POLL_MAX_INTERVAL, int(resume_timeout) / 4),
+    )
+
+
+def _format_states(states: Dict) -> str:
+    states_messages = []
+    for key in sorted(states.keys()):
+        if key != "UNKNOWN":
+            states_messages.append("{}={}".format(key, states[key]))
+        else:
+            for ukey in sorted(states["UNKNOWN"].keys()):
+                states_messages.append(
+                    "{}={}".format(ukey, states["UNKNOWN"][ukey])
+                )
+    return " , ".join(states_messages)
+
+
 def wait_for_resume(
     config: Dict,
     operation_id: str,
@@ -241,57 +326,62 @@ def wait_for_resume(
     omega = clock.time() + 3600
 
     ready_nodes: List[Node] = []
-
-    while clock.time() < omega:
-        states, ready_nodes = waiter.check_nodes(node_list, get_latest_nodes())
-        terminal_states = (
-            states.get("Ready", 0)
-            + sum(states.get("UNKNOWN", {}).values())
-            + states.get("Failed", 0)
-        )
-
-        if states != previous_states:
-            states_messages = []
-            for key in sorted(states.keys()):
-                if key != "UNKNOWN":
-                    states_messages.append("{}={}".format(key, states[key]))
-                else:
-                    for ukey in sorted(states["UNKNOWN"].keys()):
-                        states_messages.append(
-                            "{}={}".format(ukey, states["UNKNOWN"][ukey])
-                        )
-
-            states_message = " , ".join(states_messages)
-            logging.info(
-                "OperationId=%s NodeList=%s: Number of nodes in each state: %s",
-                operation_id,
-                nodes_str,
-                states_message,
+    # poll every 5s while nodes are making progress, back off while they are not
+    interval = _RESUME_POLL_MIN_INTERVAL
+    max_interval = _resume_poll_max_interval()
+
+    try:
+        while clock.time() < omega:
+            states, ready_nodes = waiter.check_nodes(node_list, get_latest_nodes())
+            terminal_states = (
+                states.get("Ready", 0)
+                + sum(states.get("UNKNOWN", {}).values())
+                + states.get("Failed", 0)
             )
 
-        if terminal_states == len(node_list):
-            break
-
-        previous_states = states
-        clock.sleep(5)
+            if states != previous_states:
+                logging.info(
+                    "OperationId=%s NodeList=%s: Number of nodes in each state: %s",
+                    operation_id,
+                    nodes_str,
+                    _format_states(states),
+                )
+                interval = _RESUME_POLL_MIN_INTERVAL
+            else:
+                interval = min(interval * 1.5, max_interval)
+
+            if terminal_states == len(node_list):
+                break
+
+            previous_states = states
+            clock.sleep(interval)
+    except KeyboardInterrupt:
+        logging.warning(
+            "OperationId=%s NodeList=%s: Interrupted while waiting. Last known states: %s",
+            operation_id,
+            nodes_str,
+            _format_states(previous_states),
+        )
+        raise
 
     logging.info(
         "The following nodes reached Ready state: %s",
         ",".join([x.name for x in ready_nodes]),
     )
+    ready_static_nodes = []
     for node in ready_nodes:
         if not hpcutil.is_valid_hostname(config, node):
             continue
         is_dynamic = node.software_configuration.get("slurm", {}).get("dynamic_config")
         if is_dynamic:
             continue
-        slutil.scontrol(
-            [
-                "update",
-                "NodeName=%s" % node.name,
-                "NodeAddr=%s" % node.private_ip,
-                "NodeHostName=%s" % node.hostname,
-            ]
+        ready_static_nodes.append(node)
+
+    if ready_static_nodes:
+        scontrol_update(
+            [n.name for n in ready_static_nodes],
+            NodeAddr=[n.private_ip for n in ready_static_nodes],
+            NodeHostName=[n.hostname for n in ready_static_nodes],
         )
 
     logging.info(
@@ -2,18 +2,20 @@
 # Licensed under the MIT License.
 #
 import argparse
+import bisect
+import functools
+import hashlib
 import json
 import logging
 import os
 import shutil
 import sys
 import time
-import traceback
 from argparse import ArgumentParser
 from datetime import date, datetime, time, timedelta
 from math import ceil
 from subprocess import SubprocessError, check_output
-from typing import Any, Callable, Dict, Iterable, List, Optional, TextIO, Union
+from typing import Any, Callable, Dict, Iterable, List, Optional, TextIO, Tuple, Union
 
 from hpc.autoscale.cost.azurecost import azurecost
 from hpc.autoscale.ccbindings import new_cluster_bindings
@@ -74,33 +76,23 @@ class SlurmDriver(GenericDriver):
             default_value=default_dampened_memory,
         )
 
+        nodearrays = config.setdefault("nodearrays", {})
         for b in node_mgr.get_buckets():
-            if "nodearrays" not in config:
-                config["nodearrays"] = {}
-            if b.nodearray not in config["nodearrays"]:
-                config["nodearrays"][b.nodearray] = {}
+            na = nodearrays.setdefault(b.nodearray, {})
 
-            if "generated_placement_group_buffer" in config["nodearrays"][b.nodearray]:
+            if "generated_placement_group_buffer" in na:
                 continue
 
-            is_hpc = (
-                str(
-                    b.software_configuration.get("slurm", {}).get("hpc") or "false"
-                ).lower()
-                == "true"
-            )
+            slurm_config = b.software_configuration.get("slurm", {})
+            is_hpc = str(slurm_config.get("hpc") or "false").lower() == "true"
             if is_hpc:
                 buffer = 1
                 max_pgs = 1
             else:
                 buffer = 0
                 max_pgs = 0
-            config["nodearrays"][b.nodearray][
-                "generated_placement_group_buffer"
-            ] = buffer
-            config["nodearrays"][b.nodearray][
-                "max_placement_groups"
-            ] = max_pgs
+            na["generated_placement_group_buffer"] = buffer
+            na["max_placement_groups"] = max_pgs
         super().preprocess_node_mgr(config, node_mgr)
 
 
@@ -108,6 +100,11 @@ class SlurmCLI(CommonCLI):
     def __init__(self) -> None:
         super().__init__(project_name="slurm")
         self.slurm_node_names = []
+        # one NodeManager / partition fetch per invocation, unless forced
+        self._node_mgr_cache: Dict[int, NodeManager] = {}
+        self._partitions_cache: Dict[
+            Tuple[int, bool], List[partitionlib.Partition]
+        ] = {}
 
     @disablecommand
     def create_nodes(self, *args: Any, **kwargs: Dict) -> None:
@@ -126,14 +123,16 @@ class SlurmCLI(CommonCLI):
         assert False
 
     def _add_completion_data(self, completion_json: Dict) -> None:
-        node_names = slutil.check_output(["sinfo", "-N", "-h", "-o", "%N"]).splitlines(
-            keepends=False
-        )
-        node_lists = slutil.check_output(["sinfo", "-h", "-o", "%N"]).strip().split(",")
-        completion_json["slurm_node_names"] = node_names + node_lists
+        # one sinfo round trip to slurmctld - expanding the hostlists is local
+        node_lists = slutil.check_output(["sinfo", "-h", "-o", "%N"]).split()
+        node_names = slutil.from_hostlist(",".join(node_lists)) if node_lists else []
+        completion_json["slurm_node_names"] = sorted(set(node_names + node_lists))
 
     def _read_completion_data(self, completion_json: Dict) -> None:
-        self.slurm_node_names = completion_json.get("slurm_node_names", [])
+        # kept sorted so the completer can bisect on the typed prefix
+        self.slurm_node_names = tuple(
+            sorted(completion_json.get("slurm_node_names", []))
+        )
 
     def _slurm_node_name_completer(
         self,
@@ -143,10 +142,15 @@ class SlurmCLI(CommonCLI):
         parsed_args: argparse.Namespace,
     ) -> List[str]:
         self._get_example_nodes(parsed_args.config)
-        output_prefix = ""
-        if prefix.endswith(","):
-            output_prefix = prefix
-        return [output_prefix + x + "," for x in self.slurm_node_names]
+        # only complete the token after the last comma
+        comma = prefix.rfind(",")
+        output_prefix, token = prefix[: comma + 1], prefix[comma + 1 :]
+        names = self.slurm_node_names
+        start = bisect.bisect_left(names, token)
+        end = start
+        while end < len(names) and names[end].startswith(token):
+            end += 1
+        return [output_prefix + x + "," for x in names[start:end]]
 
     def cost_parser(self, parser: ArgumentParser) -> None:
         parser.add_argument("-s", "--start",  type=lambda s: datetime.strptime(s, '%Y-%m-%d'),
@@ -192,7 +196,7 @@ class SlurmCLI(CommonCLI):
         Generates partition configuration
         """
         node_mgr = self._get_node_manager(config)
-        partitions = partitionlib.fetch_partitions(node_mgr, include_dynamic=True)  # type: ignore
+        partitions = self._fetch_partitions(node_mgr, include_dynamic=True)
         _partitions(
             partitions,
             sys.stdout,
@@ -204,7 +208,8 @@ class SlurmCLI(CommonCLI):
         """
         Generates topology plugin configuration
         """
-        return _generate_topology(self._get_node_manager(config), sys.stdout)
+        node_mgr = self._get_node_manager(config)
+        return _generate_topology(self._fetch_partitions(node_mgr), sys.stdout)
 
     def resume_parser(self, parser: ArgumentParser) -> None:
         parser.set_defaults(read_only=False)
@@ -222,7 +227,7 @@ class SlurmCLI(CommonCLI):
         allocation.wait_for_nodes_to_terminate(bindings, node_list)
 
         node_mgr = self._get_node_manager(config)
-        partitions = partitionlib.fetch_partitions(node_mgr, include_dynamic=True)
+        partitions = self._fetch_partitions(node_mgr, include_dynamic=True)
         bootup_result = allocation.resume(config, node_mgr, node_list, partitions)
         if not bootup_result:
             raise AzureSlurmError(
@@ -231,11 +236,16 @@ class SlurmCLI(CommonCLI):
         if no_wait:
             return
 
+        booted_node_list = [n.name for n in (bootup_result.nodes or [])]
+        if not booted_node_list:
+            # every requested node already exists, so there is nothing to wait on
+            logging.info("No new nodes were started for %s", ",".join(node_list[:5]))
+            return
+
         def get_latest_nodes() -> List[Node]:
             node_mgr = self._get_node_manager(config, force=True)
             return node_mgr.get_nodes()
 
-        booted_node_list = [n.name for n in (bootup_result.nodes or [])]
         allocation.wait_for_resume(
             config, bootup_result.operation_id, booted_node_list, get_latest_nodes
         )
@@ -258,14 +268,17 @@ class SlurmCLI(CommonCLI):
         allocation.wait_for_resume(config, "noop", node_list, get_latest_nodes)
 
     def _shutdown(self, node_list: List[str], node_mgr: NodeManager) -> None:
-        by_name = hpcutil.partition_single(node_mgr.get_nodes(), lambda node: node.name)
-        node_list_filtered = []
+        # names should be unique, but like allocation.resume, first one wins
+        by_name: Dict[str, Node] = {}
+        for node in node_mgr.get_nodes():
+            by_name.setdefault(node.name, node)
+        nodes = []
         for node_name in node_list:
-            if node_name in by_name:
-                node_list_filtered.append(node_name)
-            else:
+            node = by_name.get(node_name)
+            if node is None:
                 logging.info(f"{node_name} does not exist. Skipping.")
-        nodes = _as_nodes(node_list_filtered, node_mgr)
+                continue
+            nodes.append(node)
         result = _retry_rest(lambda: node_mgr.shutdown_nodes(nodes))
         logging.info(str(result))
 
@@ -296,23 +309,42 @@ class SlurmCLI(CommonCLI):
         self._shutdown(node_list=node_list, node_mgr=node_mgr)
 
     def _get_node_manager(self, config: Dict, force: bool = False) -> NodeManager:
-        return self._node_mgr(config, self._driver(config), force=force)
+        key = id(config)
+        if not force and key in self._node_mgr_cache:
+            return self._node_mgr_cache[key]
+        node_mgr = self._node_mgr(config, self._driver(config), force=force)
+        if force:
+            # partitions fetched from the replaced NodeManager are stale
+            self._partitions_cache.clear()
+        self._node_mgr_cache[key] = node_mgr
+        return node_mgr
+
+    def _fetch_partitions(
+        self, node_mgr: NodeManager, include_dynamic: bool = False
+    ) -> List[partitionlib.Partition]:
+        key = (id(node_mgr), include_dynamic)
+        if key not in self._partitions_cache:
+            self._partitions_cache[key] = partitionlib.fetch_partitions(  # type: ignore
+                node_mgr, include_dynamic=include_dynamic
+            )
+        return self._partitions_cache[key]
 
     def _setup_shell_locals(self, config: Dict) -> Dict:
         # TODO
         shell = {}
-        partitions = partitionlib.fetch_partitions(self._get_node_manager(config))  # type: ignore
+        shell["node_mgr"] = node_mgr = self._get_node_manager(config)
+        partitions = self._fetch_partitions(node_mgr)
         shell["partitions"] = ShellDict(
             hpcutil.partition_single(partitions, lambda p: p.name)
         )
-        shell["node_mgr"] = node_mgr = self._get_node_manager(config)
         nodes = {}
 
         for node in node_mgr.get_nodes():
             node.shellify()
             nodes[node.name] = node
-            if node.hostname:
-                nodes[node.hostname] = node
+            hostname = node.hostname
+            if hostname:
+                nodes[hostname] = node
         shell["nodes"] = ShellDict(nodes)
 
         def slurmhelp() -> None:
@@ -427,7 +459,7 @@ class SlurmCLI(CommonCLI):
         logging.debug(
             "Using backup directory %s for azure.conf and gres.conf", backup_dir
         )
-        os.makedirs(backup_dir)
+        os.makedirs(backup_dir, exist_ok=True)
 
         azure_conf = os.path.join(sched_dir, "azure.conf")
         gres_conf = os.path.join(sched_dir, "gres.conf")
@@ -442,13 +474,13 @@ class SlurmCLI(CommonCLI):
             print("WARNING: " + msg, file=sys.stderr)
             logging.warning(msg)
 
-        if os.path.exists(azure_conf):
-            shutil.copyfile(azure_conf, os.path.join(backup_dir, "azure.conf"))
-
-        if os.path.exists(gres_conf):
-            shutil.copyfile(gres_conf, os.path.join(backup_dir, "gres.conf"))
+        for conf in [azure_conf, gres_conf]:
+            try:
+                shutil.copy2(conf, os.path.join(backup_dir, os.path.basename(conf)))
+            except FileNotFoundError:
+                pass
 
-        partition_dict = partitionlib.fetch_partitions(node_mgr)
+        partition_dict = self._fetch_partitions(node_mgr)
         with open(azure_conf + ".tmp", "w") as fw:
             _partitions(
                 partition_dict,
@@ -458,16 +490,19 @@ class SlurmCLI(CommonCLI):
             )
         # Issue #193 - failure to maintain ownership/permissions when
         # rewriting azure.conf and gres.conf
-        _move_with_permissions(azure_conf + ".tmp", azure_conf)
+        azure_changed = _replace_if_changed(azure_conf + ".tmp", azure_conf)
 
+        # node states come from CycleCloud, not azure.conf, so always sync them
         _update_future_states(node_mgr)
 
         with open(gres_conf + ".tmp", "w") as fw:
             _generate_gres_conf(partition_dict, fw)
-        
-        _move_with_permissions(gres_conf + ".tmp", gres_conf)
 
-        if not no_restart:
+        gres_changed = _replace_if_changed(gres_conf + ".tmp", gres_conf)
+
+        if not (azure_changed or gres_changed):
+            logging.info("No changes to azure.conf or gres.conf, skipping slurmctld restart")
+        elif not no_restart:
             logging.info("Restarting slurmctld...")
             check_output(["systemctl", "restart", "slurmctld"])
 
@@ -518,24 +553,14 @@ class SlurmCLI(CommonCLI):
         else:
             hostnames = current_susp_nodes + node_list
 
-        all_susp_hostnames = (
-            slutil.check_output(
-                [
-                    "scontrol",
-                    "show",
-                    "hostnames",
-                    ",".join(hostnames),
-                ]
-            )
-            .strip()
-            .split()
-        )
+        # current_susp_nodes and node_list are already expanded, so we only
+        # need to dedup/sort them here and compress them back into a hostlist
         all_susp_hostnames = sorted(
-            list(set(all_susp_hostnames)), key=slutil.get_sort_key_func(False)
+            set(hostnames), key=slutil.get_sort_key_func(False)
         )
-        all_susp_hostlist = slutil.check_output(
-            ["scontrol", "show", "hostlist", ",".join(all_susp_hostnames)]
-        ).strip()
+        all_susp_hostlist = ""
+        if all_susp_hostnames:
+            all_susp_hostlist = slutil.to_hostlist(all_susp_hostnames)
 
         with open(f"{config_dir}/keep_alive.conf.tmp", "w") as fw:
             if all_susp_hostlist:
@@ -585,12 +610,40 @@ class SlurmCLI(CommonCLI):
 
 
 def _move_with_permissions(src: str, dst: str) -> None:
-    if os.path.exists(dst):
+    try:
         st = os.stat(dst)
+    except FileNotFoundError:
+        pass
+    else:
         os.chmod(src, st.st_mode)
         os.chown(src, st.st_uid, st.st_gid)
     logging.debug("Moving %s to %s", src, dst)
-    shutil.move(src, dst)
+    # src is always a sibling tmp file, so this is an atomic rename
+    os.replace(src, dst)
+
+
+def _file_digest(path: str) -> Optional[bytes]:
+    try:
+        with open(path, "rb") as fr:
+            digest = hashlib.blake2b()
+            for chunk in iter(lambda: fr.read(65536), b""):
+                digest.update(chunk)
+            return digest.digest()
+    except FileNotFoundError:
+        return None
+
+
+def _replace_if_changed(src: str, dst: str) -> bool:
+    """
+    Moves src over dst, unless they already have the same contents, in which case
+    src is removed. Returns True if dst was replaced.
+    """
+    if _file_digest(dst) == _file_digest(src):
+        logging.debug("%s is unchanged, discarding %s", dst, src)
+        os.unlink(src)
+        return False
+    _move_with_permissions(src, dst)
+    return True
 
 
 def _dynamic_partition(partition: partitionlib.Partition, writer: TextIO) -> None:
@@ -614,6 +667,16 @@ def _dynamic_partition(partition: partitionlib.Partition, writer: TextIO) -> Non
     writer.write("\n")
 
 
+_PARTITION_HEADER = (
+    "# Note: To account for OS/VM overhead, by default we reduce the reported memory from CycleCloud by 5%.\n"
+    "# We do this because Slurm will reject a node that reports less than what is defined in this config.\n"
+    "# There are two ways to change this:\n"
+    "#  1) edit slurm.dampen_memory=X in the nodearray's Configuration where X is percentage (5 = 5%).\n"
+    "#  2) Edit the slurm_memory value defined in /opt/azurehpc/slurm/autosacle.json.\n"
+    "# Note that slurm.dampen_memory will take precedence.\n"
+)
+
+
 def _partitions(
     partitions: List[partitionlib.Partition],
     writer: TextIO,
@@ -622,19 +685,9 @@ def _partitions(
 ) -> None:
 
     written_dynamic_partitions = set()
+    state = "CLOUD" if autoscale else "FUTURE"
 
-    writer.write(
-        f"# Note: To account for OS/VM overhead, by default we reduce the reported memory from CycleCloud by 5%.\n"
-    )
-    writer.write(
-        "# We do this because Slurm will reject a node that reports less than what is defined in this config.\n"
-    )
-    writer.write(
-        "# There are two ways to change this:\n" +
-        "#  1) edit slurm.dampen_memory=X in the nodearray's Configuration where X is percentage (5 = 5%).\n"
-        "#  2) Edit the slurm_memory value defined in /opt/azurehpc/slurm/autosacle.json.\n" + 
-        "# Note that slurm.dampen_memory will take precedence.\n"
-    )
+    writer.write(_PARTITION_HEADER)
 
     for partition in partitions:
         if partition.dynamic_config:
@@ -646,7 +699,9 @@ def _partitions(
             written_dynamic_partitions.add(partition.name)
             continue
 
-        node_list = partition.node_list or []
+        # node_list is a property that shells out to scontrol, so only read it once
+        partition_node_list = partition.node_list
+        node_list = partition_node_list or []
 
         max_count = min(partition.max_vm_count, partition.max_scaleset_size)
         default_yn = "YES" if partition.is_default else "NO"
@@ -661,29 +716,23 @@ def _partitions(
             threads = 1
         def_mem_per_cpu = memory // cpus
 
-
-        writer.write(
-            "PartitionName={} Nodes={} Default={} DefMemPerCPU={} MaxTime=INFINITE State=UP\n".format(
-                partition.name, partition.node_list, default_yn, def_mem_per_cpu
-            )
-        )
-
-        state = "CLOUD" if autoscale else "FUTURE"
-        writer.write(
-            "Nodename={} Feature=cloud STATE={} CPUs={} ThreadsPerCore={} RealMemory={}".format(
-                node_list, state, cpus, threads, memory
-            )
-        )
+        parts = [
+            f"PartitionName={partition.name} Nodes={partition_node_list} Default={default_yn}"
+            f" DefMemPerCPU={def_mem_per_cpu} MaxTime=INFINITE State=UP\n",
+            f"Nodename={node_list} Feature=cloud STATE={state} CPUs={cpus}"
+            f" ThreadsPerCore={threads} RealMemory={memory}",
+        ]
 
         if partition.gpu_count:
-            writer.write(" Gres=gpu:{}".format(partition.gpu_count))
-
-        writer.write("\n")
+            parts.append(f" Gres=gpu:{partition.gpu_count}")
 
+        parts.append("\n")
+        writer.write("".join(parts))
 
-def _generate_topology(node_mgr: NodeManager, writer: TextIO) -> None:
-    partitions = partitionlib.fetch_partitions(node_mgr)
 
+def _generate_topology(
+    partitions: List[partitionlib.Partition], writer: TextIO
+) -> None:
     nodes_by_pg = {}
     for partition in partitions:
         for pg, node_list in partition.node_list_by_pg.items():
@@ -696,26 +745,30 @@ def _generate_topology(node_mgr: NodeManager, writer: TextIO) -> None:
             "No nodes found to create topology! Do you need to run create_nodes first?"
         )
 
+    lines = []
     for pg in sorted(nodes_by_pg.keys(), key=lambda x: x if x is not None else ""):
         nodes = nodes_by_pg[pg]
         if not nodes:
             continue
         nodes = sorted(nodes, key=slutil.get_sort_key_func(bool(pg)))
         slurm_node_expr = ",".join(nodes)  # slutil.to_hostlist(",".join(nodes))
-        writer.write("SwitchName={} Nodes={}\n".format(pg or "htc", slurm_node_expr))
+        lines.append(f"SwitchName={pg or 'htc'} Nodes={slurm_node_expr}\n")
+    writer.write("".join(lines))
 
 
+@functools.lru_cache(maxsize=None)
 def _generate_nvidia_devices(gpu_count: int) -> str:
     if gpu_count == 1:
         return "/dev/nvidia0"
-    return "/dev/nvidia[0-{}]".format(gpu_count - 1)
+    return f"/dev/nvidia[0-{gpu_count - 1}]"
 
 
+@functools.lru_cache(maxsize=None)
 def _generate_amd_devices(gpu_count: int) -> str:
     if gpu_count == 1:
         return "/dev/dri/renderD128"
     amd_gpu_list = ", ".join([f"{128+8*index}" for index in range(0, gpu_count)])
-    return "/dev/dri/renderD[{}]".format(amd_gpu_list)
+    return f"/dev/dri/renderD[{amd_gpu_list}]"
 
 
 def _generate_gpu_devices(partition: partitionlib.Partition) -> str:
@@ -740,6 +793,7 @@ def _generate_gpu_devices(partition: partitionlib.Partition) -> str:
 
 
 def _generate_gres_conf(partitions: List[partitionlib.Partition], writer: TextIO):
+    lines: List[str] = []
     for partition in partitions:
         if partition.node_list is None:
             raise RuntimeError(
@@ -750,10 +804,17 @@ def _generate_gres_conf(partitions: List[partitionlib.Partition], writer: TextIO
         num_placement_groups = int(
             ceil(float(partition.max_vm_count) / partition.max_scaleset_size)
         )
+        gpu_count = partition.gpu_count
+        if not gpu_count:
+            # non-gpu partitions only contribute blank lines, so skip the hostlist work
+            lines.extend([""] * num_placement_groups)
+            continue
+
         all_nodes = sorted(
             slutil.from_hostlist(partition.node_list),
             key=slutil.get_sort_key_func(partition.is_hpc),
         )
+        gpu_devices = _generate_gpu_devices(partition)
 
         for pg_index in range(num_placement_groups):
             start = pg_index * partition.max_scaleset_size
@@ -763,28 +824,40 @@ def _generate_gres_conf(partitions: List[partitionlib.Partition], writer: TextIO
             subset_of_nodes = all_nodes[start:end]
             node_list = slutil.to_hostlist(",".join((subset_of_nodes)))
             # cut out 1gb so that the node reports at least this amount of memory. - recommended by schedmd
+            lines.append(
+                f"Nodename={node_list} Name=gpu Count={gpu_count} File={gpu_devices}"
+            )
 
-            if partition.gpu_count:
-                gpu_devices = _generate_gpu_devices(partition)
-                writer.write(
-                    "Nodename={} Name=gpu Count={} File={}".format(
-                        node_list, partition.gpu_count, gpu_devices
-                    )
-                )
+    if lines:
+        writer.write("\n".join(lines) + "\n")
 
-            writer.write("\n")
 
 def _update_future_states(node_mgr: NodeManager) -> None:
     autoscale_enabled = is_autoscale_enabled()
     if autoscale_enabled:
         return
-    nodes = node_mgr.get_nodes()
+    nodes = [n for n in node_mgr.get_nodes() if n.target_state != "Started"]
+    if not nodes:
+        return
+
+    names = [n.name for n in nodes]
+    try:
+        allocation.scontrol_update(
+            names, retry=False, NodeAddr=names, NodeHostName=names, state="FUTURE"
+        )
+        return
+    except SubprocessError:
+        logging.warning(
+            "Could not set %d nodes to state=FUTURE at once, retrying one at a time",
+            len(names),
+        )
 
+    # fall back to one call per node so a single bad node does not block the rest
     for node in nodes:
-        if node.target_state != "Started":
-            name = node.name
-            try:
-                cmd = [
+        name = node.name
+        try:
+            check_output(
+                [
                     "scontrol",
                     "update",
                     f"NodeName={name}",
@@ -792,12 +865,12 @@ def _update_future_states(node_mgr: NodeManager) -> None:
                     f"NodeHostName={name}",
                     "state=FUTURE",
                 ]
-                check_output(cmd)
-            except SubprocessError:
-                logging.warning(f"Could not set {node.get('Name')} state=FUTURE")
+            )
+        except SubprocessError:
+            logging.warning(f"Could not set {node.get('Name')} state=FUTURE")
 
 
-def _retry_rest(func: Callable, attempts: int = 5) -> Any:
+def _retry_rest(func: Callable, attempts: int = 5, max_interval: float = 30.0) -> Any:
     attempts = max(1, attempts)
     last_exception = None
     for attempt in range(1, attempts + 1):
@@ -805,9 +878,9 @@ def _retry_rest(func: Callable, attempts: int = 5) -> Any:
             return func()
         except Exception as e:
             last_exception = e
-            logging.debug(traceback.format_exc())
-
-            clock.sleep(attempt * attempt)
+            logging.debug("retry attempt %d failed", attempt, exc_info=True)
+            if attempt < attempts:
+                clock.sleep(slutil.backoff_interval(attempt, max_interval=max_interval))
 
     raise AzureSlurmError(str(last_exception))
 
@@ -828,17 +901,6 @@ def hostlist_null_star(hostlist_expr: str) -> Optional[List[str]]:
     return slutil.from_hostlist(hostlist_expr)
 
 
-def _as_nodes(node_list: List[str], node_mgr: NodeManager) -> List[Node]:
-    nodes: List[Node] = []
-    by_name = hpcutil.partition_single(node_mgr.get_nodes(), lambda node: node.name)
-    for node_name in node_list:
-        # TODO error handling on missing node names
-        if node_name not in by_name:
-            raise AzureSlurmError(f"Unknown node - {node_name}")
-        nodes.append(by_name[node_name])
-    return nodes
-
-
 def main(argv: Optional[Iterable[str]] = None) -> None:
     clilibmain(argv or sys.argv[1:], "slurm", SlurmCLI())
 
@@ -11,6 +11,13 @@ import subprocess
 from collections import namedtuple
 from hpc.autoscale.cost.azurecost import azurecost
 
+try:
+    # squeue --json output can be many MB on a busy cluster
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 log = logging.getLogger('cost')
 
 def run_command(cmd: list, stdout=subprocess.PIPE, stderr=subprocess.PIPE):
@@ -148,8 +155,8 @@ class CostSlurm:
     def process_queue(self) -> dict:
         running_jobs = {}
         queue_rec = self.get_queue_records()
-        with open(queue_rec, 'r') as fp:
-            data = json.load(fp)
+        with open(queue_rec, 'rb') as fp:
+            data = _json_loads(fp.read())
 
         for job in data['jobs']:
             if job['job_state'] != 'RUNNING' and job['job_state'] != 'CONFIGURING':
@@ -173,7 +180,7 @@ class CostSlurm:
 
     def parse_admincomment(self, comment: str):
 
-        return json.loads(comment)
+        return _json_loads(comment)
 
     def get_output_format(self, azcost: azurecost):
 
@@ -67,6 +67,7 @@ class Partition:
         self.dynamic_config = dynamic_config
         # cache node_list property for dynamic partitions
         self.__dynamic_node_list_cache = None
+        self.__bucket_by_node_cache: Optional[Dict[str, NodeBucket]] = None
         self.node_list_by_pg: Dict[
             Optional[PlacementGroup], List[str]
         ] = _construct_node_list(self)
@@ -86,12 +87,22 @@ class Partition:
 
         
     def bucket_for_node(self, node_name: str) -> NodeBucket:
-        for pg, node_list in self.node_list_by_pg.items():
-            if node_name in node_list:
-                for bucket in self.buckets:
-                    if bucket.placement_group == pg:
-                        return bucket
-        raise RuntimeError()
+        # node_list_by_pg is fixed at construction, so index it on first use
+        # instead of scanning every node list on each call.
+        if self.__bucket_by_node_cache is None:
+            bucket_by_node: Dict[str, NodeBucket] = {}
+            for pg, node_list in self.node_list_by_pg.items():
+                pg_buckets = [b for b in self.buckets if b.placement_group == pg]
+                if not pg_buckets:
+                    continue
+                for name in node_list:
+                    bucket_by_node.setdefault(name, pg_buckets[0])
+            self.__bucket_by_node_cache = bucket_by_node
+
+        bucket = self.__bucket_by_node_cache.get(node_name)
+        if bucket is None:
+            raise RuntimeError()
+        return bucket
     
     _SLURM_NODES_CACHE = None
 
@@ -1,9 +1,11 @@
+import functools
 import logging
 from abc import ABC, abstractmethod
+import os
 import random
+import re
 import subprocess as subprocesslib
 import time
-import traceback
 from abc import ABC, abstractmethod
 from typing import Any, Callable, Dict, List, Optional, Union
 
@@ -99,7 +101,22 @@ def from_hostlist(hostlist_expr: str) -> List[str]:
     return [x.strip() for x in stdout.split()]
 
 
-def retry_rest(func: Callable, attempts: int = 5) -> Any:
+def backoff_interval(
+    attempt: int,
+    base: float = 1.0,
+    factor: float = 2.0,
+    max_interval: float = 30.0,
+    jitter: float = 0.25,
+) -> float:
+    """
+    Truncated exponential backoff for the 1-based attempt, randomized by +/- jitter
+    so that concurrent callers do not retry in lockstep. Never exceeds max_interval.
+    """
+    interval = base * factor ** (attempt - 1)
+    return min(max_interval, interval * (1 + random.uniform(-jitter, jitter)))
+
+
+def retry_rest(func: Callable, attempts: int = 5, max_interval: float = 30.0) -> Any:
     attempts = max(1, attempts)
     last_exception = None
     for attempt in range(1, attempts + 1):
@@ -107,14 +124,16 @@ def retry_rest(func: Callable, attempts: int = 5) -> Any:
             return func()
         except Exception as e:
             last_exception = e
-            logging.debug(traceback.format_exc())
-
-            time.sleep(attempt * attempt)
+            logging.debug("retry attempt %d failed", attempt, exc_info=True)
+            if attempt < attempts:
+                time.sleep(backoff_interval(attempt, max_interval=max_interval))
 
     raise AzureSlurmError(str(last_exception))
 
 
-def retry_subprocess(func: Callable, attempts: int = 5) -> Any:
+def retry_subprocess(
+    func: Callable, attempts: int = 5, max_interval: float = 30.0
+) -> Any:
     attempts = max(1, attempts)
     last_exception: Optional[Exception] = None
     for attempt in range(1, attempts + 1):
@@ -122,9 +141,10 @@ def retry_subprocess(func: Callable, attempts: int = 5) -> Any:
             return func()
         except Exception as e:
             last_exception = e
-            logging.debug(traceback.format_exc())
+            logging.debug("retry attempt %d failed", attempt, exc_info=True)
             logging.warning("Command failed, retrying: %s", str(e))
-            time.sleep(attempt * attempt)
+            if attempt < attempts:
+                time.sleep(backoff_interval(attempt, max_interval=max_interval))
 
     raise AzureSlurmError(str(last_exception))
 
@@ -166,7 +186,7 @@ def _node_index_as_sort_key(nodename: str) -> Union[str, int]:
     Used to get the key to sort names that don't have name-pg#-# format
     """
     try:
-        return int(nodename.split("-")[-1])
+        return int(nodename.rsplit("-", 1)[-1])
     except Exception:
         return nodename
 
@@ -176,41 +196,63 @@ def _node_index_and_pg_as_sort_key(nodename: str) -> Union[str, int]:
     Used to get the key to sort names that have name-pg#-# format
     """
     try:
-        node_index = int(nodename.split("-")[-1])
-        pg = int(nodename.split("-")[-2].replace("pg", "")) * 100000
+        toks = nodename.rsplit("-", 2)
+        node_index = int(toks[-1])
+        pg = int(toks[-2].replace("pg", "")) * 100000
         return pg + node_index
     except Exception:
         return nodename
 
 
-_IS_AUTOSCALE_ENABLED = None
+_SLURM_CONF = "/etc/slurm/slurm.conf"
+_SLURM_CONF_RE = re.compile(rb"(?m)^[ \t]*(\w+)[ \t]*=[ \t]*(\S+)")
+_SUSPEND_TIME_VALUE_RE = re.compile(r"(?i)(NONE|INFINITE)|(-?\d+)")
 
 
-def is_autoscale_enabled() -> bool:
-    global _IS_AUTOSCALE_ENABLED
-    if _IS_AUTOSCALE_ENABLED is not None:
-        return _IS_AUTOSCALE_ENABLED
+def _slurm_conf_mtime() -> Optional[float]:
     try:
-        with open("/etc/slurm/slurm.conf") as fr:
-            lines = fr.readlines()
-    except Exception:
-        _IS_AUTOSCALE_ENABLED = True
-        return _IS_AUTOSCALE_ENABLED
+        return os.stat(_SLURM_CONF).st_mtime
+    except OSError:
+        return None
 
-    for line in lines:
-        line = line.strip()
-        # this can be defined more than once
-        if line.startswith("SuspendTime ") or line.startswith("SuspendTime="):
-            suspend_time = line.split("=")[1].strip().split()[0]
-            try:
-                if suspend_time in ["NONE", "INFINITE"] or int(suspend_time) < 0:
-                    _IS_AUTOSCALE_ENABLED = False
-                else:
-                    _IS_AUTOSCALE_ENABLED = True
-            except Exception:
-                pass
-
-    if _IS_AUTOSCALE_ENABLED is not None:
-        return _IS_AUTOSCALE_ENABLED
+
+@functools.lru_cache(maxsize=1)
+def _parse_slurm_config(conf_mtime: Optional[float]) -> Dict[str, str]:
+    # conf_mtime is only the cache key, so an edited slurm.conf is re-read
+    try:
+        with open(_SLURM_CONF, "rb") as fr:
+            raw = fr.read()
+    except OSError:
+        return {}
+    # later definitions override earlier ones, as they do for slurmctld
+    return {
+        key.decode(): value.decode() for key, value in _SLURM_CONF_RE.findall(raw)
+    }
+
+
+def get_slurm_config() -> Dict[str, str]:
+    """
+    The first key=value of each line in slurm.conf, e.g. {"SuspendTime": "300"}.
+    Parsed once per slurm.conf mtime. Callers must not modify the returned dict.
+    """
+    return _parse_slurm_config(_slurm_conf_mtime())
+
+
+get_slurm_config.cache_clear = _parse_slurm_config.cache_clear  # type: ignore
+
+
+def is_autoscale_enabled() -> bool:
+    conf_mtime = _slurm_conf_mtime()
+    if conf_mtime is None:
+        return True
+    suspend_time = _parse_slurm_config(conf_mtime).get("SuspendTime", "")
+    match = _SUSPEND_TIME_VALUE_RE.fullmatch(suspend_time)
+    if match:
+        disabled_keyword, seconds = match.groups()
+        return not (disabled_keyword or int(seconds) < 0)
     logging.warning("Could not determine if autoscale is enabled. Assuming yes")
-    return True
\ No newline at end of file
+    return True
+
+
+# the answer is derived from the cached slurm.conf parse, so that is the only cache
+is_autoscale_enabled.cache_clear = _parse_slurm_config.cache_clear  # type: ignore
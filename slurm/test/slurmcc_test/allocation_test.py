@@ -1,9 +1,11 @@
 from typing import Callable, Dict, List, Tuple
 
+import pytest
 from hpc.autoscale import clock
 from hpc.autoscale import util as hpcutil
 from hpc.autoscale.ccbindings.mock import MockClusterBinding
 from hpc.autoscale.node.node import Node
+from hpc.autoscale.node.nodemanager import NodeManager
 from slurmcc import allocation
 from slurmcc import partition
 from slurmcc.partition import fetch_partitions
@@ -24,11 +26,23 @@ class MockWaiter(allocation.WaitForResume):
         return super().check_nodes(node_list, latest_nodes)
 
 
-def test_basic_resume() -> None:
-    node_mgr = testutil.make_test_node_manager()
+# Every test here allocates nodes through its NodeManager, so these stay function
+# scoped - a shared NodeManager or partition list would leak nodes between tests.
+@pytest.fixture
+def node_mgr() -> NodeManager:
+    return testutil.make_test_node_manager()
+
+
+@pytest.fixture
+def partitions(node_mgr: NodeManager) -> List[partition.Partition]:
+    return fetch_partitions(node_mgr)
+
+
+def test_basic_resume(
+    node_mgr: NodeManager, partitions: List[partition.Partition]
+) -> None:
     bindings: MockClusterBinding = node_mgr.cluster_bindings  # type: ignore
     node_list = ["hpc-1", "hpc-2", "htc-1"]
-    partitions = fetch_partitions(node_mgr)
     native_cli = testutil.make_native_cli()
 
     bootup_result = allocation.resume(testutil.CONFIG, node_mgr, node_list, partitions)
@@ -73,10 +87,10 @@ def test_basic_resume() -> None:
     assert node_list == [n.name for n in ready]
 
 
-def test_mixed_resume_names() -> None:
-    node_mgr = testutil.make_test_node_manager()
+def test_mixed_resume_names(
+    node_mgr: NodeManager, partitions: List[partition.Partition]
+) -> None:
     node_list = ["hpc-4", "hpc-20"]
-    partitions = fetch_partitions(node_mgr)
 
     bootup_result = allocation.resume(testutil.CONFIG, node_mgr, node_list, partitions)
     assert bootup_result
@@ -85,8 +99,7 @@ def test_mixed_resume_names() -> None:
     assert node_list == [n.name for n in bootup_result.nodes]
 
  
-def test_resume_dynamic_by_feature() -> None:
-    node_mgr = testutil.make_test_node_manager()
+def test_resume_dynamic_by_feature(node_mgr: NodeManager) -> None:
     bindings: MockClusterBinding = node_mgr.cluster_bindings  # type: ignore
     native_cli = testutil.make_native_cli()
     native_cli.create_nodes(["mydynamic"], features=["dyn"])
@@ -122,11 +135,11 @@ def test_resume_dynamic_by_feature() -> None:
 
 
 
-def test_failure_mode() -> None:
-    node_mgr = testutil.make_test_node_manager()
+def test_failure_mode(
+    node_mgr: NodeManager, partitions: List[partition.Partition]
+) -> None:
     bindings: MockClusterBinding = node_mgr.cluster_bindings  # type: ignore
     node_list = ["hpc-1", "hpc-2", "htc-1"]
-    partitions = fetch_partitions(node_mgr)
     native_cli = testutil.make_native_cli()
 
     bootup_result = allocation.resume(testutil.CONFIG, node_mgr, node_list, partitions)
@@ -157,3 +170,41 @@ def test_failure_mode() -> None:
     bindings.update_state("Failed", ["htc-1"])
     states, ready = waiter.check_nodes(node_list, get_latest_nodes())
     assert native_cli.slurm_nodes["htc-1"]["NodeAddr"] == "htc-1", states
+
+
+def test_scontrol_update_batches(monkeypatch: pytest.MonkeyPatch) -> None:
+    native_cli = testutil.make_native_cli()
+    calls: List[List[str]] = []
+    scontrol = native_cli.scontrol
+
+    def record_scontrol(args: List[str], retry: bool = True) -> str:
+        calls.append(args)
+        return scontrol(args, retry)
+
+    monkeypatch.setattr(native_cli, "scontrol", record_scontrol)
+    monkeypatch.setattr(allocation, "_SCONTROL_UPDATE_BATCH_SIZE", 3)
+
+    node_list = ["hpc-%d" % i for i in range(1, 8)]
+    addrs = ["10.1.0.%d" % i for i in range(1, 8)]
+    allocation.scontrol_update(node_list, NodeAddr=addrs, state="FUTURE")
+
+    assert calls == [
+        [
+            "update",
+            "NodeName=hpc-1,hpc-2,hpc-3",
+            "NodeAddr=10.1.0.1,10.1.0.2,10.1.0.3",
+            "state=FUTURE",
+        ],
+        [
+            "update",
+            "NodeName=hpc-4,hpc-5,hpc-6",
+            "NodeAddr=10.1.0.4,10.1.0.5,10.1.0.6",
+            "state=FUTURE",
+        ],
+        ["update", "NodeName=hpc-7", "NodeAddr=10.1.0.7", "state=FUTURE"],
+    ]
+    for node_name, addr in zip(node_list, addrs):
+        assert native_cli.slurm_nodes[node_name]["NodeAddr"] == addr
+        assert native_cli.slurm_nodes[node_name]["state"] == "FUTURE"
+    # untouched nodes keep their defaults
+    assert native_cli.slurm_nodes["hpc-8"]["NodeAddr"] == "hpc-8"
@@ -0,0 +1,165 @@
+import argparse
+import os
+from subprocess import CalledProcessError
+from typing import List, NamedTuple
+
+import pytest
+from slurmcc import cli
+from slurmcc import util as slutil
+
+from . import testutil
+
+
+def test_scale_skips_restart_when_unchanged(tmp_path, monkeypatch) -> None:
+    node_mgr = testutil.make_test_node_manager()
+    testutil.make_native_cli()
+
+    # no slurm.conf means autoscale is enabled, so _update_future_states is a no-op
+    monkeypatch.setattr(slutil, "_SLURM_CONF", str(tmp_path / "missing.conf"))
+    slutil.is_autoscale_enabled.cache_clear()
+
+    commands: List[List[str]] = []
+    monkeypatch.setattr(cli, "check_output", lambda cmd: commands.append(cmd))
+
+    sched_dir = tmp_path / "sched"
+    sched_dir.mkdir()
+    config = {"config_dir": str(sched_dir)}
+
+    slurm_cli = cli.SlurmCLI()
+    monkeypatch.setattr(
+        slurm_cli, "_get_node_manager", lambda config, force=False: node_mgr
+    )
+
+    def scale() -> None:
+        slurm_cli.scale(
+            config,
+            no_restart=False,
+            backup_dir=str(tmp_path / "backups"),
+            slurm_conf_dir=str(tmp_path),
+        )
+
+    scale()
+    assert commands == [["systemctl", "restart", "slurmctld"]]
+    azure_conf = (sched_dir / "azure.conf").read_text()
+    assert "PartitionName=hpc" in azure_conf
+
+    # identical confs - nothing to reload, so no restart and no leftover tmp files
+    scale()
+    assert commands == [["systemctl", "restart", "slurmctld"]]
+    assert (sched_dir / "azure.conf").read_text() == azure_conf
+    assert not os.path.exists(sched_dir / "azure.conf.tmp")
+    assert not os.path.exists(sched_dir / "gres.conf.tmp")
+
+    slutil.is_autoscale_enabled.cache_clear()
+
+
+class FakeNode(NamedTuple):
+    name: str
+    target_state: str
+
+    def get(self, key: str) -> str:
+        assert key == "Name"
+        return self.name
+
+
+class FakeNodeManager:
+    def __init__(self, nodes: List[FakeNode]) -> None:
+        self.nodes = nodes
+
+    def get_nodes(self) -> List[FakeNode]:
+        return self.nodes
+
+
+@pytest.fixture
+def autoscale_disabled(tmp_path, monkeypatch):
+    slurm_conf = tmp_path / "slurm.conf"
+    slurm_conf.write_text("SuspendTime=-1\n")
+    monkeypatch.setattr(slutil, "_SLURM_CONF", str(slurm_conf))
+    slutil.is_autoscale_enabled.cache_clear()
+    yield
+    slutil.is_autoscale_enabled.cache_clear()
+
+
+def _future_node_mgr() -> FakeNodeManager:
+    return FakeNodeManager(
+        [
+            FakeNode("hpc-1", "Deallocated"),
+            FakeNode("hpc-2", "Started"),
+            FakeNode("htc-1", "Terminated"),
+        ]
+    )
+
+
+def test_update_future_states(autoscale_disabled, monkeypatch) -> None:
+    native_cli = testutil.make_native_cli()
+    commands: List[List[str]] = []
+    monkeypatch.setattr(cli, "check_output", lambda cmd: commands.append(cmd))
+
+    cli._update_future_states(_future_node_mgr())  # type: ignore
+
+    # one scontrol update for every non-started node, no per node fallback
+    assert not commands
+    for name in ["hpc-1", "htc-1"]:
+        assert native_cli.slurm_nodes[name]["state"] == "FUTURE"
+        assert native_cli.slurm_nodes[name]["NodeAddr"] == name
+        assert native_cli.slurm_nodes[name]["NodeHostName"] == name
+    assert "state" not in native_cli.slurm_nodes["hpc-2"]
+
+
+def test_update_future_states_fallback(autoscale_disabled, monkeypatch) -> None:
+    native_cli = testutil.make_native_cli()
+
+    def failing_scontrol(args: List[str], retry: bool = True) -> str:
+        raise CalledProcessError(1, ["scontrol"] + args)
+
+    monkeypatch.setattr(native_cli, "scontrol", failing_scontrol)
+
+    commands: List[List[str]] = []
+
+    def check_output(cmd: List[str]) -> str:
+        commands.append(cmd)
+        if "NodeName=hpc-1" in cmd:
+            raise CalledProcessError(1, cmd)
+        return ""
+
+    monkeypatch.setattr(cli, "check_output", check_output)
+
+    cli._update_future_states(_future_node_mgr())  # type: ignore
+
+    # a failing node does not stop the rest from being updated
+    assert commands == [
+        [
+            "scontrol",
+            "update",
+            f"NodeName={name}",
+            f"NodeAddr={name}",
+            f"NodeHostName={name}",
+            "state=FUTURE",
+        ]
+        for name in ["hpc-1", "htc-1"]
+    ]
+
+
+def test_slurm_node_name_completer(monkeypatch) -> None:
+    slurm_cli = cli.SlurmCLI()
+    monkeypatch.setattr(slurm_cli, "_get_example_nodes", lambda config: None)
+    slurm_cli._read_completion_data(
+        {"slurm_node_names": ["htc-2", "hpc-10", "hpc-1", "htc-1", "hpc-2"]}
+    )
+
+    def complete(prefix: str) -> List[str]:
+        parsed_args = argparse.Namespace(config={})
+        return slurm_cli._slurm_node_name_completer(
+            prefix, None, None, parsed_args  # type: ignore
+        )
+
+    assert complete("") == ["hpc-1,", "hpc-10,", "hpc-2,", "htc-1,", "htc-2,"]
+    assert complete("hpc-1") == ["hpc-1,", "hpc-10,"]
+    # only the token after the last comma is completed
+    assert complete("hpc-1,ht") == ["hpc-1,htc-1,", "hpc-1,htc-2,"]
+    assert complete("hpc-1,htc-2,hpc-2") == ["hpc-1,htc-2,hpc-2,"]
+    assert complete("hpc-1,") == [
+        "hpc-1," + name + "," for name in ["hpc-1", "hpc-10", "hpc-2", "htc-1", "htc-2"]
+    ]
+    assert complete("gpu") == []
+    assert complete("zzz") == []
@@ -82,10 +82,15 @@ class MockNativeSlurmCLI(NativeSlurmCLI):
         if args[0] == "update":
             entity, value = args[1].split("=")
             if entity == "NodeName":
-                slurm_node = self.slurm_nodes[value]
+                # like scontrol, NodeName=a,b NodeAddr=x,y sets a=x and b=y
+                node_names = value.split(",")
                 for expr in args[2:]:
                     key, value = expr.split("=")
-                    slurm_node[key] = value
+                    values = value.split(",")
+                    if len(values) != len(node_names):
+                        values = [value] * len(node_names)
+                    for node_name, node_value in zip(node_names, values):
+                        self.slurm_nodes[node_name][key] = node_value
             else:
                 raise RuntimeError(f"Unknown args {args}")
             return ""
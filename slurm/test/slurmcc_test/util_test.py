@@ -0,0 +1,78 @@
+import os
+
+import pytest
+
+from slurmcc import util as slutil
+
+
+@pytest.fixture
+def slurm_conf(tmp_path, monkeypatch):
+    path = tmp_path / "slurm.conf"
+    monkeypatch.setattr(slutil, "_SLURM_CONF", str(path))
+    slutil.is_autoscale_enabled.cache_clear()
+    yield path
+    slutil.is_autoscale_enabled.cache_clear()
+
+
+@pytest.mark.parametrize(
+    "contents,expected",
+    [
+        ("SuspendTime=300\n", True),
+        ("SuspendTime = -1\n", False),
+        ("SuspendTime=NONE\n", False),
+        ("SuspendTime=infinite\n", False),
+        ("#SuspendTime=-1\nSuspendTime=300\n", True),
+        ("SuspendTime=300\n#SuspendTime=-1\n", True),
+        # like slurmctld, the last definition wins
+        ("SuspendTime=-1\nSuspendTime=300\n", True),
+        ("SuspendTime=300\n  SuspendTime=-1 # disabled\n", False),
+        # unparseable or missing values assume autoscale is enabled
+        ("SuspendTime=bogus\n", True),
+        ("ClusterName=c1\n", True),
+    ],
+)
+def test_is_autoscale_enabled(slurm_conf, contents: str, expected: bool) -> None:
+    slurm_conf.write_text(contents)
+    assert slutil.is_autoscale_enabled() == expected
+
+
+def test_is_autoscale_enabled_missing_conf(slurm_conf) -> None:
+    assert not slurm_conf.exists()
+    assert slutil.is_autoscale_enabled()
+
+
+def test_get_slurm_config(slurm_conf) -> None:
+    slurm_conf.write_text(
+        "# comment=ignored\n"
+        "ClusterName=c1\n"
+        "SuspendTime = 300\n"
+        "NodeName=hpc-1 Feature=cloud\n"
+        "#SuspendTime=-1\n"
+        "SuspendTimeout=600\n"
+    )
+    assert slutil.get_slurm_config() == {
+        "ClusterName": "c1",
+        "SuspendTime": "300",
+        "NodeName": "hpc-1",
+        "SuspendTimeout": "600",
+    }
+
+
+def test_cache_clear(slurm_conf) -> None:
+    slurm_conf.write_text("SuspendTime=-1\n")
+    assert not slutil.is_autoscale_enabled()
+
+    # same mtime, so only cache_clear makes the new contents visible
+    mtime = slurm_conf.stat().st_mtime_ns
+    slurm_conf.write_text("SuspendTime=300\n")
+    os.utime(slurm_conf, ns=(mtime, mtime))
+    assert not slutil.is_autoscale_enabled()
+
+    slutil.is_autoscale_enabled.cache_clear()
+    assert slutil.is_autoscale_enabled()
+
+
+def test_backoff_interval() -> None:
+    for attempt in range(1, 10):
+        interval = slutil.backoff_interval(attempt, max_interval=30.0)
+        assert 0.75 * min(30.0, 2.0 ** (attempt - 1)) <= interval <= 30.0